@@ -1,11 +1,13 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import seaborn as sns
 import plotly.express as px
-import plotly.graph_objects as go
 import streamlit as st
 from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from bisect import bisect_left
 
 # ============================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -65,67 +67,75 @@ st.markdown('<p class="sub-header">Análise exploratória de dados de obesidade
 st.sidebar.title("⚙️ Painel de Controle")
 st.sidebar.markdown("---")
 
+# Base de dados única do repositório, independente do diretório de execução
+DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "Obesity.csv"
+
+# Renomeação das colunas para português (definida uma única vez no módulo)
+COLUMN_NAME = {
+    'Gender': 'sexo',
+    'Age': 'idade',
+    'Height': 'altura',
+    'Weight': 'peso',
+    'family_history': 'hist_familiar_obes',
+    'FAVC': 'cons_altas_cal_freq',
+    'FCVC': 'cons_verduras',
+    'NCP': 'refeicoes_principais_dia',
+    'CAEC': 'lancha_entre_ref',
+    'SMOKE': 'fuma',
+    'CH2O': 'agua_dia',
+    'SCC': 'controle_calorias',
+    'FAF': 'ativ_fisica',
+    'TUE': 'uso_tecnologia',
+    'CALC': 'cons_alcool',
+    'MTRANS': 'transporte',
+    'Obesity': 'nivel_obesidade'
+}
+
+# Mapeamento dos valores para português
+VALUE_MAPPING = {
+    'sexo': {'Male': 'Masculino', 'Female': 'Feminino'},
+    'hist_familiar_obes': {'yes': 'Sim', 'no': 'Não'},
+    'cons_altas_cal_freq': {'yes': 'Sim', 'no': 'Não'},
+    'cons_verduras': {'yes': 'Sim', 'no': 'Não'},
+    'lancha_entre_ref': {'frequently': 'Frequentemente', 'sometimes': 'Às vezes', 'always': 'Sempre', 'no': 'Nunca'},
+    'fuma': {'yes': 'Sim', 'no': 'Não'},
+    'controle_calorias': {'yes': 'Sim', 'no': 'Não'},
+    'cons_alcool': {'never': 'Nunca', 'always': 'Sempre', 'frequently': 'Frequentemente', 'sometimes': 'Às vezes'},
+    'transporte': {
+        'Public_Transportation': 'Transporte Público',
+        'Automobile': 'Automóvel',
+        'Bike': 'Bicicleta',
+        'Walking': 'A pé'
+    },
+    'nivel_obesidade': {
+        'Insufficient_Weight': 'Peso Insuficiente',
+        'Normal_Weight': 'Peso Normal',
+        'Overweight_Level_I': 'Sobrepeso Nível I',
+        'Overweight_Level_II': 'Sobrepeso Nível II',
+        'Obesity_Type_I': 'Obesidade Tipo I',
+        'Obesity_Type_II': 'Obesidade Tipo II',
+        'Obesity_Type_III': 'Obesidade Tipo III'
+    }
+}
+
 # Carregamento e preparação dos dados
 @st.cache_data
 def load_and_prepare_data():
     """Carrega e prepara os dados com cache para melhor performance"""
-    df = pd.read_csv("Obesity.csv")
-    
-    # Dicionário de renomeação para português
-    column_name = {
-        'Gender': 'sexo',
-        'Age': 'idade',
-        'Height': 'altura',
-        'Weight': 'peso',
-        'family_history': 'hist_familiar_obes',
-        'FAVC': 'cons_altas_cal_freq',
-        'FCVC': 'cons_verduras',
-        'NCP': 'refeicoes_principais_dia',
-        'CAEC': 'lancha_entre_ref',
-        'SMOKE': 'fuma',
-        'CH2O': 'agua_dia',
-        'SCC': 'controle_calorias',
-        'FAF': 'ativ_fisica',
-        'TUE': 'uso_tecnologia',
-        'CALC': 'cons_alcool',
-        'MTRANS': 'transporte',
-        'Obesity': 'nivel_obesidade'
-    }
-    
-    df = df.rename(columns=column_name).copy()
+    df = pd.read_csv(DATA_PATH)
     
-    # Mapeamento dos valores para português
-    value_mapping = {
-        'sexo': {'Male': 'Masculino', 'Female': 'Feminino'},
-        'hist_familiar_obes': {'yes': 'Sim', 'no': 'Não'},
-        'cons_altas_cal_freq': {'yes': 'Sim', 'no': 'Não'},
-        'cons_verduras': {'yes': 'Sim', 'no': 'Não'},
-        'lancha_entre_ref': {'frequently': 'Frequentemente', 'sometimes': 'Às vezes', 'always': 'Sempre', 'no': 'Nunca'},
-        'fuma': {'yes': 'Sim', 'no': 'Não'},
-        'controle_calorias': {'yes': 'Sim', 'no': 'Não'},
-        'cons_alcool': {'never': 'Nunca', 'always': 'Sempre', 'frequently': 'Frequentemente', 'sometimes': 'Às vezes'},
-        'transporte': {
-            'Public_Transportation': 'Transporte Público',
-            'Automobile': 'Automóvel',
-            'Bike': 'Bicicleta',
-            'Walking': 'A pé'
-        },
-        'nivel_obesidade': {
-            'Insufficient_Weight': 'Peso Insuficiente',
-            'Normal_Weight': 'Peso Normal',
-            'Overweight_Level_I': 'Sobrepeso Nível I',
-            'Overweight_Level_II': 'Sobrepeso Nível II',
-            'Obesity_Type_I': 'Obesidade Tipo I',
-            'Obesity_Type_II': 'Obesidade Tipo II',
-            'Obesity_Type_III': 'Obesidade Tipo III'
-        }
-    }
+    df = df.rename(columns=COLUMN_NAME)
     
     # Aplicar mapeamento
-    for coluna, mapa in value_mapping.items():
+    for coluna, mapa in VALUE_MAPPING.items():
         if coluna in df.columns:
             df[coluna] = df[coluna].replace(mapa)
     
+    # Colunas de texto como 'category': menos memória e cópias mais baratas do cache a cada execução
+    # (categorias em ordem alfabética, a mesma usada pelo groupby das colunas de texto)
+    for coluna in df.select_dtypes(include="object").columns:
+        df[coluna] = pd.Categorical(df[coluna], categories=sorted(df[coluna].unique()))
+    
     df = df.rename_axis('ds').sort_index()
     return df
 
@@ -143,47 +153,21 @@ min_idade = int(df["idade"].min())
 max_idade = int(df["idade"].max())
 idade_filter = st.sidebar.slider("📅 Faixa de Idade", min_idade, max_idade, (min_idade, max_idade))
 
-# Nível de Obesidade
-if "nivel_obesidade" in df.columns:
-    obesidade_list = sorted(df["nivel_obesidade"].unique())
-    obesidade_filter = st.sidebar.multiselect("⚖️ Nível de Obesidade", obesidade_list, default=obesidade_list)
-else:
-    obesidade_filter = None
-
-# Histórico familiar
-if "hist_familiar_obes" in df.columns:
-    familia_list = sorted(df["hist_familiar_obes"].unique())
-    familia_filter = st.sidebar.multiselect("👨‍👩‍👧 Histórico Familiar", familia_list, default=familia_list)
-else:
-    familia_filter = None
-
-# Transporte
-if "transporte" in df.columns:
-    transporte_list = sorted(df["transporte"].unique())
-    transporte_filter = st.sidebar.multiselect("🚗 Transporte", transporte_list, default=transporte_list)
-else:
-    transporte_filter = None
-
-# Tabagismo
-if "fuma" in df.columns:
-    fuma_list = sorted(df["fuma"].unique())
-    fuma_filter = st.sidebar.multiselect("🚭 Tabagismo", fuma_list, default=fuma_list)
-else:
-    fuma_filter = None
-
-# Snacks entre refeições
-if "lancha_entre_ref" in df.columns:
-    lancha_list = sorted(df["lancha_entre_ref"].unique())
-    lancha_filter = st.sidebar.multiselect("🍿 Snacks entre Refeições", lancha_list, default=lancha_list)
-else:
-    lancha_filter = None
-
-# Controle de Calorias
-if "controle_calorias" in df.columns:
-    controle_list = sorted(df["controle_calorias"].unique())
-    controle_filter = st.sidebar.multiselect("📊 Controle de Calorias", controle_list, default=controle_list)
-else:
-    controle_filter = None
+# Filtros categóricos: (coluna, rótulo), renderizados em sequência na sidebar
+FILTROS_CATEGORICOS = [
+    ("nivel_obesidade", "⚖️ Nível de Obesidade"),
+    ("hist_familiar_obes", "👨‍👩‍👧 Histórico Familiar"),
+    ("transporte", "🚗 Transporte"),
+    ("fuma", "🚭 Tabagismo"),
+    ("lancha_entre_ref", "🍿 Snacks entre Refeições"),
+    ("controle_calorias", "📊 Controle de Calorias")
+]
+
+filtros_categoricos = {}
+for coluna, rotulo in FILTROS_CATEGORICOS:
+    if coluna in df.columns:
+        opcoes = sorted(df[coluna].unique())
+        filtros_categoricos[coluna] = st.sidebar.multiselect(rotulo, opcoes, default=opcoes)
 
 st.sidebar.markdown("---")
 st.sidebar.markdown(f"**Última atualização:** {datetime.now().strftime('%d/%m/%Y %H:%M')}")
@@ -191,38 +175,27 @@ st.sidebar.markdown(f"**Última atualização:** {datetime.now().strftime('%d/%m
 # ============================================================
 # APLICAÇÃO DOS FILTROS
 # ============================================================
-def apply_filters(df, sexo_filter, idade_filter, obesidade_filter, familia_filter, 
-                  transporte_filter, fuma_filter, lancha_filter, controle_filter):
-    """Aplica todos os filtros selecionados"""
-    df_filtrado = df.copy()
-    
-    df_filtrado = df_filtrado[
-        (df_filtrado["sexo"].isin(sexo_filter)) &
-        (df_filtrado["idade"].between(idade_filter[0], idade_filter[1]))
-    ]
+def apply_filters(df, sexo_filter, idade_filter, filtros_categoricos):
+    """Aplica todos os filtros selecionados com uma única máscara booleana"""
+    mascara = df["sexo"].isin(sexo_filter) & df["idade"].between(idade_filter[0], idade_filter[1])
     
-    if obesidade_filter is not None:
-        df_filtrado = df_filtrado[df_filtrado["nivel_obesidade"].isin(obesidade_filter)]
+    for coluna, selecionados in filtros_categoricos.items():
+        mascara &= df[coluna].isin(selecionados)
     
-    if familia_filter is not None:
-        df_filtrado = df_filtrado[df_filtrado["hist_familiar_obes"].isin(familia_filter)]
-    
-    if transporte_filter is not None:
-        df_filtrado = df_filtrado[df_filtrado["transporte"].isin(transporte_filter)]
-    
-    if fuma_filter is not None:
-        df_filtrado = df_filtrado[df_filtrado["fuma"].isin(fuma_filter)]
-    
-    if lancha_filter is not None:
-        df_filtrado = df_filtrado[df_filtrado["lancha_entre_ref"].isin(lancha_filter)]
-    
-    if controle_filter is not None:
-        df_filtrado = df_filtrado[df_filtrado["controle_calorias"].isin(controle_filter)]
-    
-    return df_filtrado
+    return df[mascara]
 
-df_filtrado = apply_filters(df, sexo_filter, idade_filter, obesidade_filter, familia_filter,
-                           transporte_filter, fuma_filter, lancha_filter, controle_filter)
+df_filtrado = apply_filters(df, sexo_filter, idade_filter, filtros_categoricos)
+
+# Níveis considerados obesidade; comparação por igualdade evita regex a cada execução
+NIVEIS_OBESIDADE = ['Obesidade Tipo I', 'Obesidade Tipo II', 'Obesidade Tipo III']
+
+# Máscara de obesidade calculada uma única vez e reutilizada nos KPIs e insights
+# (sem a coluna de nível, ninguém é classificado como obeso e os insights de obesidade são omitidos)
+if "nivel_obesidade" in df_filtrado.columns:
+    mascara_obesidade = df_filtrado["nivel_obesidade"].isin(NIVEIS_OBESIDADE)
+else:
+    mascara_obesidade = pd.Series(False, index=df_filtrado.index)
+df_obesos = df_filtrado[mascara_obesidade]
 
 # ============================================================
 # INDICADORES PRINCIPAIS (KPIs)
@@ -256,9 +229,9 @@ col4.metric("📏 Altura Média", f"{altura_media:.2f} m",
 
 # Taxa de obesidade
 if "nivel_obesidade" in df_filtrado.columns:
-    casos_obesidade = len(df_filtrado[df_filtrado["nivel_obesidade"].str.contains("Obesidade", case=False, na=False)])
+    casos_obesidade = int(mascara_obesidade.sum())
     taxa_obesidade = (casos_obesidade / total_registros * 100) if total_registros > 0 else 0
-    casos_total = len(df[df["nivel_obesidade"].str.contains("Obesidade", case=False, na=False)])
+    casos_total = int(df["nivel_obesidade"].isin(NIVEIS_OBESIDADE).sum())
     taxa_total = (casos_total / len(df) * 100) if len(df) > 0 else 0
     delta_obesidade = f"{taxa_obesidade - taxa_total:.1f}%"
     col5.metric("⚠️ Taxa de Obesidade", f"{taxa_obesidade:.1f}%", 
@@ -273,7 +246,8 @@ st.header("1️⃣ Distribuição de Níveis de Obesidade")
 st.markdown("**Objetivo:** Compreender a proporção populacional em cada categoria de peso segundo classificação IMC.")
 
 if "nivel_obesidade" in df_filtrado.columns:
-    contagem_obesidade = df_filtrado["nivel_obesidade"].value_counts().sort_values(ascending=True)
+    # Contagem sobre os valores em texto: empates seguem a ordem de aparição nos dados filtrados
+    contagem_obesidade = df_filtrado["nivel_obesidade"].astype(str).value_counts().sort_values(ascending=True)
     df_obesidade = contagem_obesidade.reset_index()
     df_obesidade.columns = ['nivel_obesidade', 'contagem']
     df_obesidade['percentual'] = 100 * df_obesidade['contagem'] / df_obesidade['contagem'].sum()
@@ -359,9 +333,7 @@ with col2:
 
 # Insight
 if "nivel_obesidade" in df_filtrado.columns:
-    obesidade_por_sexo = df_filtrado.groupby('sexo')['nivel_obesidade'].apply(
-        lambda x: (x.str.contains('Obesidade', case=False, na=False).sum() / len(x) * 100)
-    ).round(1)
+    obesidade_por_sexo = (mascara_obesidade.groupby(df_filtrado['sexo'], observed=True).mean() * 100).round(1)
     
     if len(obesidade_por_sexo) > 0:
         sexo_maior_risco = obesidade_por_sexo.idxmax()
@@ -400,8 +372,8 @@ st.plotly_chart(fig_idade, use_container_width=True)
 
 # Insight
 if "nivel_obesidade" in df_filtrado.columns:
-    idade_obesidade = df_filtrado[df_filtrado["nivel_obesidade"].str.contains("Obesidade", case=False, na=False)]["idade"]
-    idade_normal = df_filtrado[~df_filtrado["nivel_obesidade"].str.contains("Obesidade", case=False, na=False)]["idade"]
+    idade_obesidade = df_obesos["idade"]
+    idade_normal = df_filtrado.loc[~mascara_obesidade, "idade"]
     
     if len(idade_obesidade) > 0 and len(idade_normal) > 0:
         idade_media_obesidade = idade_obesidade.mean()
@@ -443,12 +415,12 @@ if "hist_familiar_obes" in df_filtrado.columns:
     st.plotly_chart(fig_familia, use_container_width=True)
     
     # Insight
-    familia_obesidade = df_filtrado[df_filtrado['hist_familiar_obes'] == 'Sim']
-    familia_sem = df_filtrado[df_filtrado['hist_familiar_obes'] == 'Não']
+    com_familia = df_filtrado['hist_familiar_obes'] == 'Sim'
+    sem_familia = df_filtrado['hist_familiar_obes'] == 'Não'
     
-    if len(familia_obesidade) > 0 and len(familia_sem) > 0:
-        taxa_com_familia = (familia_obesidade['nivel_obesidade'].str.contains('Obesidade', case=False, na=False).sum() / len(familia_obesidade) * 100)
-        taxa_sem_familia = (familia_sem['nivel_obesidade'].str.contains('Obesidade', case=False, na=False).sum() / len(familia_sem) * 100)
+    if "nivel_obesidade" in df_filtrado.columns and com_familia.any() and sem_familia.any():
+        taxa_com_familia = mascara_obesidade[com_familia].mean() * 100
+        taxa_sem_familia = mascara_obesidade[sem_familia].mean() * 100
         
         st.markdown(f"""
         <div class="insight-box">
@@ -545,15 +517,14 @@ with col2:
 # Insights combinados
 insights_habitos = []
 if "transporte" in df_filtrado.columns:
-    transporte_obesidade = df_filtrado[df_filtrado["nivel_obesidade"].str.contains("Obesidade", case=False, na=False)]
-    if len(transporte_obesidade) > 0:
-        transporte_mais_comum = transporte_obesidade["transporte"].mode()[0] if len(transporte_obesidade["transporte"].mode()) > 0 else "N/A"
+    if len(df_obesos) > 0:
+        transporte_moda = df_obesos["transporte"].astype(str).mode()
+        transporte_mais_comum = transporte_moda[0] if len(transporte_moda) > 0 else "N/A"
         insights_habitos.append(f"Transporte mais associado à obesidade: <strong>{transporte_mais_comum}</strong>")
 
 if "controle_calorias" in df_filtrado.columns:
-    controle_obesidade = df_filtrado[df_filtrado["nivel_obesidade"].str.contains("Obesidade", case=False, na=False)]
-    if len(controle_obesidade) > 0:
-        taxa_sem_controle = (controle_obesidade["controle_calorias"] == "Não").sum() / len(controle_obesidade) * 100
+    if len(df_obesos) > 0:
+        taxa_sem_controle = (df_obesos["controle_calorias"] == "Não").mean() * 100
         insights_habitos.append(f"{taxa_sem_controle:.1f}% das pessoas com obesidade não controlam calorias")
 
 if insights_habitos:
@@ -572,16 +543,16 @@ st.markdown("---")
 st.header("6️⃣ Análise de Correlação entre Variáveis Numéricas")
 st.markdown("**Objetivo:** Identificar relações estatísticas entre variáveis contínuas para compreender fatores interdependentes.")
 
-colunas_remover = ['cons_altas_cal_freq', 'hist_familiar_obes', 'lancha_entre_ref', 'fuma', 'controle_calorias', 'transporte',
-             'sexo', 'cons_alcool', 'nivel_obesidade']
+# As colunas categóricas já ficam de fora pela seleção de tipos numéricos
+df_correl = df_filtrado.select_dtypes(include=[np.number]).dropna()
 
-df_correl = df_filtrado.drop(columns=[c for c in colunas_remover if c in df_filtrado.columns], errors='ignore')
-df_correl = df_correl.select_dtypes(include=[np.number]).dropna()
-
-if len(df_correl.columns) > 1:
-    matriz_correlacao = df_correl.corr().round(2)
-    
-    fig, ax = plt.subplots(figsize=(12, 8))
+@st.cache_data(max_entries=32)
+def build_correlation_heatmap(matriz_correlacao):
+    """Gera o heatmap como PNG com cache, reaproveitando a imagem quando a matriz não muda"""
+    # Figure direto (sem pyplot) para não acumular figuras; o cache guarda só os bytes
+    # imutáveis, evitando que sessões simultâneas renderizem o mesmo objeto Figure
+    fig = Figure(figsize=(12, 8))
+    ax = fig.subplots()
     sns.heatmap(
         matriz_correlacao, 
         annot=True, 
@@ -594,8 +565,24 @@ if len(df_correl.columns) > 1:
         cbar_kws={"shrink": 0.8}
     )
     ax.set_title('Matriz de Correlação entre Variáveis Numéricas', fontsize=14, fontweight='bold', pad=20)
-    plt.tight_layout()
-    st.pyplot(fig)
+    fig.tight_layout()
+    
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png", dpi=200, bbox_inches="tight")
+    return buffer.getvalue()
+
+# Classificação da força da correlação: |r| > 0.4 é moderada e |r| > 0.7 é forte
+LIMITES_CORRELACAO = (0.4, 0.7)
+FORCA_CORRELACAO = [
+    ('Correlação fraca', 'fracamente'),
+    ('Correlação moderada', 'moderadamente'),
+    ('Correlação forte', 'fortemente')
+]
+
+if len(df_correl.columns) > 1:
+    matriz_correlacao = df_correl.corr().round(2)
+    
+    st.image(build_correlation_heatmap(matriz_correlacao), use_container_width=True)
     
     # Insight
     if len(matriz_correlacao) > 0:
@@ -605,12 +592,13 @@ if len(df_correl.columns) > 1:
         if len(correlacoes) > 0:
             max_corr = correlacoes.abs().idxmax()
             valor_corr = correlacoes.loc[max_corr]
+            forca, intensidade = FORCA_CORRELACAO[bisect_left(LIMITES_CORRELACAO, abs(valor_corr))]
             
             st.markdown(f"""
             <div class="insight-box">
                 <strong>💡 Insight:</strong> A maior correlação observada é entre <strong>{max_corr[0]}</strong> e <strong>{max_corr[1]}</strong> 
-                (r = {valor_corr:.2f}). {'Correlação forte' if abs(valor_corr) > 0.7 else 'Correlação moderada' if abs(valor_corr) > 0.4 else 'Correlação fraca'}, 
-                indicando que estas variáveis estão {'fortemente' if abs(valor_corr) > 0.7 else 'moderadamente' if abs(valor_corr) > 0.4 else 'fracamente'} relacionadas. 
+                (r = {valor_corr:.2f}). {forca}, 
+                indicando que estas variáveis estão {intensidade} relacionadas. 
                 Esta relação pode sugerir causalidade ou fatores comuns subjacentes que devem ser considerados em modelos preditivos e intervenções clínicas.
             </div>
             """, unsafe_allow_html=True)
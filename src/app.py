@@ -2,19 +2,14 @@
 # # Notebook de análise exploratória dos dados (EDA)
 
 # %%
+from pathlib import Path
+
 import pandas as pd
-import numpy as np
-import matplotlib as mpl
 import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
-import matplotlib.dates as mdates
 import seaborn as sns
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import plotly.express as px
 
 # %%
-import pandas as pd
 #import pandas_ta as ta
 
 import warnings
@@ -25,10 +20,16 @@ st.header("Análise Exploratória dos Dados - EDA")
 st.write("Visualizações e insights iniciais sobre o conjunto de dados de obesidade.")
 
 # %%
-input_path = "C:/Users/wbaldin/Desktop/fase04/Obesity.csv"
+input_path = Path(__file__).resolve().parent.parent / "data" / "Obesity.csv"
 
-df = pd.read_csv(input_path)
-df = df.rename_axis('ds').sort_index()
+@st.cache_data
+def load_data(path):
+    """Carrega os dados com cache para não reler o CSV a cada interação"""
+    df = pd.read_csv(path)
+    df = df.rename_axis('ds').sort_index()
+    return df
+
+df = load_data(input_path)
 df.tail()
 
 # %%
@@ -42,7 +43,6 @@ px.histogram(df, x = 'family_history', text_auto = True, color = 'Obesity', barm
              color_discrete_sequence=px.colors.qualitative.Vivid)
 
 # %%
-import plotly.express as px
 fig = px.histogram(df, x="Obesity", color="Gender",barmode = 'group', text_auto=True, category_orders={"Obesity": ["Insufficient Weight", "Normal Weight", "Overweight Level I", "Overweight Level II", "Obesity Type I", "Obesity Type II", "Obesity Type III"]}, 
                    color_discrete_sequence=px.colors.qualitative.Vivid)
 fig.show()
@@ -51,22 +51,18 @@ fig.show()
 px. histogram(df,x= "Age", text_auto = True, color = 'Obesity', barmode = 'group')
 
 # %%
-import plotly.express as px
 fig = px.histogram(df, x="Obesity", color="MTRANS",barmode = 'group', text_auto=True, category_orders={"Obesity": ["Insufficient Weight", "Normal Weight", "Overweight Level I", "Overweight Level II", "Obesity Type I", "Obesity Type II", "Obesity Type III"]}, )
 fig.show()
 
 # %%
-import plotly.express as px
 fig = px.histogram(df, x="Obesity", color="CAEC",barmode = 'group', text_auto=True, category_orders={"Obesity": ["Insufficient Weight", "Normal Weight", "Overweight Level I", "Overweight Level II", "Obesity Type I", "Obesity Type II", "Obesity Type III"]}, )
 fig.show()
 
 # %%
-import plotly.express as px
 fig = px.histogram(df, x="Obesity", color="SMOKE",barmode = 'group', text_auto=True, category_orders={"Obesity": ["Insufficient Weight", "Normal Weight", "Overweight Level I", "Overweight Level II", "Obesity Type I", "Obesity Type II", "Obesity Type III"]}, )
 fig.show()
 
 # %%
-import plotly.express as px
 fig = px.histogram(df, x="Obesity", color="SCC",barmode = 'group', text_auto=True, category_orders={"Obesity": ["Insufficient Weight", "Normal Weight", "Overweight Level I", "Overweight Level II", "Obesity Type I", "Obesity Type II", "Obesity Type III"]}, )
 fig.show()
 